@@ -1,18 +1,25 @@
 import logging
 import sys
-import toml
+import os
+import marshal
 import random
 import time
+import functools
+import collections
+import queue
+import threading
+from dataclasses import dataclass
 from PIL import Image, ImageDraw
-from luma.core.interface.serial import i2c, spi
-import luma.oled.device as oled
-import luma.lcd.device as lcd
 
-# Enable debug logging
+# Log at info level, debug messages are formatted lazily and skipped
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
+logger = logging.getLogger(__name__)
+
+# Log every rendered frame at debug level, off by default as it runs for every frame
+_TRACE = False
 
 # Default configuration for the OLED screen
 DEFAULT_SCREEN_CONFIG = {
@@ -50,40 +57,120 @@ DEFAULT_RENDER_CONFIG = {
     },
 }
 
-# Global variable to track and pass on to functions
-current_face = "default"
-current_offset_x = 0
-current_offset_y = 0
-current_curious = False
-current_closed = False
-current_bg_color = "black"
-current_eye_color = "yellow"
+# Animation speeds in pixels per frame, indexed by the speed index of the speed name
+_SPEED_IDX = {"fast": 0, "medium": 1, "slow": 2}
+LOOK_STEPS = (8, 4, 2)
+BLINK_STEPS = (12, 8, 4)
+
+# Horizontal and vertical sign of each look direction, unknown directions look at the center
+_DIRECTIONS = {
+    "C": (0, 0),
+    "L": (-1, 0),
+    "R": (1, 0),
+    "T": (0, -1),
+    "B": (0, 1),
+    "TL": (-1, -1),
+    "TR": (1, -1),
+    "BL": (-1, 1),
+    "BR": (1, 1),
+}
+
+# Eyelid masks, keyed by eye side, face and eye size
+_eyelid_cache = {}
+
+# Number of recently rendered frames kept on each device
+RENDERED_FRAME_CACHE_SIZE = 32
+
+# Faces and offsets of the still poses drawn when the eyes are set up
+STILL_FACES = ("default", "happy", "angry", "tired")
+STILL_OFFSETS = (-10, -5, 0, 5, 10)
+
+# Number of frames waiting for the display thread, besides the one being sent
+DISPLAY_QUEUE_SIZE = 1
+
+# Drivers whose frame buffer can be written directly as packed display pages
+PAGE_PACKED_DRIVERS = ("ssd1306",)
+
+def deep_merge(base, override):
+    """
+    Merge two configuration dictionaries, keeping the nested defaults missing from the override.
+    :param base: Default configuration dictionary
+    :param override: Configuration dictionary overriding the defaults
+    :return: New merged configuration dictionary
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def _parse_toml(file_path):
+    """
+    Parse a TOML file, importing the parser only when a file actually needs parsing.
+    :param file_path: Path to the TOML file
+    :return: Parsed configuration dictionary
+    """
+    try:
+        import tomllib
+        mode = "rb"
+    except ImportError:  # Python < 3.11 has no tomllib, fall back to the toml package
+        import toml as tomllib
+        mode = "r"
+    with open(file_path, mode) as f:
+        return tomllib.load(f)
 
 def load_config(file_path, default_config):
     """
     Load configuration from a TOML file. If the file is missing, use the default configuration.
+    The parsed file is cached next to it with marshal and only parsed again when the file is newer than the cache.
+    marshal only stores plain values, so unlike pickle loading the cache can't run code. A cache that can't be
+    loaded or doesn't hold a configuration dictionary is ignored.
     :param file_path: Path to the TOML file
     :param default_config: Default configuration dictionary
     :return: Loaded configuration dictionary
     """
+    cache_path = os.path.join(os.path.dirname(file_path), "." + os.path.basename(file_path) + ".cache.marshal")
     try:
-        with open(file_path, "r") as f:
-            logging.info(f"Loading configuration from {file_path}...")
-            config = toml.load(f)
-            logging.info(f"Configuration loaded successfully from {file_path}.")
-            return {**default_config, **config}  # Merge defaults with loaded config
+        logger.info("Loading configuration from %s...", file_path)
+        mtime = os.path.getmtime(file_path)
+        try:
+            if os.path.getmtime(cache_path) >= mtime:
+                with open(cache_path, "rb") as f:
+                    config = marshal.load(f)
+                if not isinstance(config, dict):
+                    raise ValueError("cache does not hold a configuration dictionary")
+                merged = deep_merge(default_config, config)  # Merge defaults with loaded config
+                logger.info("Configuration loaded from cache %s.", cache_path)
+                return merged
+        except Exception as e:  # Missing or unusable cache, parse the file
+            logger.debug("Ignoring configuration cache %s: %s", cache_path, e)
+
+        config = _parse_toml(file_path)
+        logger.info("Configuration loaded successfully from %s.", file_path)
+        try:
+            with open(cache_path, "wb") as f:
+                marshal.dump(config, f)
+        except (OSError, ValueError) as e:  # ValueError for values marshal can't store, like TOML dates
+            logger.debug("Could not write configuration cache %s: %s", cache_path, e)
+        return deep_merge(default_config, config)  # Merge defaults with loaded config
     except FileNotFoundError:
-        logging.warning(f"{file_path} not found. Using default configuration.")
+        logger.warning("%s not found. Using default configuration.", file_path)
         return default_config
     except Exception as e:
-        logging.error(f"Error reading configuration from {file_path}: {e}")
+        logger.error("Error reading configuration from %s: %s", file_path, e)
         sys.exit(1)
 
 def validate_screen_config(config):
     """
     Validate the screen configuration to ensure required fields are present.
+    Validated configurations are marked with "_validated" and not checked again.
     :param config: Screen configuration dictionary
     """
+    if config.get("_validated"):
+        return
+
     try:
         screen = config["screen"]
         required_fields = ["type", "driver", "width", "height", "interface"]
@@ -96,13 +183,27 @@ def validate_screen_config(config):
             raise ValueError("Missing 'i2c' section for I2C interface.")
         if screen["interface"] == "spi" and "spi" not in screen:
             raise ValueError("Missing 'spi' section for SPI interface.")
+        config["_validated"] = True
     except KeyError as e:
-        logging.error(f"Configuration validation error: Missing key {e}")
+        logger.error("Configuration validation error: Missing key %s", e)
         sys.exit(1)
     except ValueError as e:
-        logging.error(f"Configuration validation error: {e}")
+        logger.error("Configuration validation error: %s", e)
         sys.exit(1)
 
+def i2c_bus_speed(port):
+    """
+    Read the clock of an I2C bus from the device tree, as set with dtparam=i2c_arm_baudrate on a Raspberry Pi.
+    :param port: I2C bus number
+    :return: Bus clock in Hz, or None if it is not available
+    """
+    try:
+        with open(f"/sys/class/i2c-adapter/i2c-{port}/of_node/clock-frequency", "rb") as f:
+            value = f.read(4)
+    except OSError:
+        return None
+    return int.from_bytes(value, "big") if len(value) == 4 else None
+
 def get_device(config):
     """
     Create and initialize the display device based on the configuration.
@@ -113,11 +214,23 @@ def get_device(config):
         screen = config["screen"]
         validate_screen_config(config)
 
+        # luma is imported here, so only the interface and driver package the screen needs are loaded
+        from luma.core.interface.serial import i2c, spi
+
         # Create the serial interface
         serial = None  # Initialize serial variable
         if screen["interface"] == "i2c":
             i2c_address = int(screen["i2c"]["address"], 16)
-            serial = i2c(port=screen["i2c"].get("i2c_port", 1), address=i2c_address)
+            # luma opens the bus itself here and sends every data write as a single i2c_rdwr message,
+            # so the bus clock set with dtparam=i2c_arm_baudrate is what limits the frame rate
+            i2c_port = screen["i2c"].get("i2c_port", 1)
+            bus_speed = i2c_bus_speed(i2c_port)
+            if bus_speed is not None and bus_speed < 400000:
+                logger.warning(
+                    "I2C bus %s runs at %d Hz, add dtparam=i2c_arm_baudrate=400000 (or 1000000) "
+                    "to /boot/config.txt for faster frames.", i2c_port, bus_speed,
+                )
+            serial = i2c(port=i2c_port, address=i2c_address)
         elif screen["interface"] == "spi":
             spi_params = screen["spi"]
             gpio_params = screen.get("gpio", {})
@@ -128,13 +241,18 @@ def get_device(config):
                 gpio_RST=gpio_params.get("gpio_reset"),
                 gpio_backlight=gpio_params.get("gpio_backlight"),
                 bus_speed_hz=spi_params.get("spi_bus_speed", 8000000),
+                transfer_size=spi_params.get("spi_transfer_size", 4096),
             )
         else:
             raise ValueError(f"Unsupported interface type: {screen['interface']}")
 
         # Dynamically load the driver
         driver_name = screen["driver"]
-        driver_module = getattr(oled, driver_name, None) or getattr(lcd, driver_name, None)
+        if screen["type"] == "oled":
+            import luma.oled.device as driver_package
+        else:
+            import luma.lcd.device as driver_package
+        driver_module = getattr(driver_package, driver_name, None)
 
         if driver_module is None:
             raise ValueError(f"Unsupported driver: {driver_name}")
@@ -142,197 +260,410 @@ def get_device(config):
         # Initialize the device
         device = driver_module(serial, width=screen["width"], height=screen["height"], rotate=screen.get("rotate", 0))
 
-        logging.info(f"Initialized {screen['type']} screen with driver {driver_name}.")
+        logger.info("Initialized %s screen with driver %s.", screen["type"], driver_name)
         return device
         
     except ValueError as e:
-        logging.error(f"Configuration error: {e}")
+        logger.error("Configuration error: %s", e)
         sys.exit(1)
     except Exception as e:
-        logging.error(f"Error initializing screen: {e}")
+        logger.error("Error initializing screen: %s", e)
         sys.exit(1)
 
-def draw_eyes(device, config, bg_color=None, eye_color=None, offset_x=None, offset_y=None, blink_height_left=None, blink_height_right=None, 
-              face=None, curious=None, command=None, target_offset_x=None, target_offset_y=None, speed="medium", 
-              eye="both", closed=None):
+@functools.lru_cache(maxsize=8)
+def _color_layer(mode, size, color):
+    """
+    Get a solid image in the given color, used to colorize the monochrome frames for color screens.
+    :param mode: Image mode of the display
+    :param size: Size of the display
+    :param color: Color of the layer
+    :return: Image filled with the color
     """
-    Draw the eyes on the display with optional face-based eyelids and support for curious mode.
-    Automatically adjusts eyelids when the face value changes.
+    return Image.new(mode, size, color)
 
+def display_frame(device, image, bg_color="black", eye_color="white", bbox=None):
+    """
+    Send a frame to the display.
+    SSD1306 screens get the frame packed into display pages with Pillow and written in a single transfer,
+    other drivers fall back to the display() method of the luma device.
+    Frames are drawn in mode "1", color screens get them colorized here into a frame kept on the device.
+    Only the area where the eyes are or were in the previous frame is updated, the first frame is always sent in full.
     :param device: Display device
-    :param config: Configuration dictionary
-    :param offset_x: Horizontal offset for eye movement (optional, defaults to global current_offset_x)
-    :param offset_y: Vertical offset for eye movement (optional, defaults to global current_offset_y)
-    :param blink_height_left: Current height of the left eye for blinking
-    :param blink_height_right: Current height of the right eye for blinking
-    :param face: Optional face parameter to adjust eyelids
-    :param curious: If True, adjust eye sizes based on position
-    :param command: Command to execute ("look", "blink", or None)
-    :param target_offset_x: Target horizontal offset for look animations
-    :param target_offset_y: Target vertical offset for look animations
-    :param speed: Speed of animation ("fast", "medium", "slow")
-    :param eye: Specify which eye to blink ("left", "right", or "both")
-    """
-    global current_bg_color, current_eye_color, current_face, current_offset_x, current_offset_y, current_curious, current_closed  # Use global variables for state
-
-    # Default black background and yellow eyecolor when using a color screen
-    if device.mode == "1":  # Monochrome OLED
-        bg_color = "black"
-        eye_color = "white"
-    else:  # Color LCD
-        if bg_color is None:
-            bg_color = current_bg_color or config["color"]["bg"]
-        if eye_color is None:
-            eye_color = current_eye_color or config["color"]["eye"]
-        
-    # Default to global offsets if not explicitly provided
-    if offset_x is None:
-        offset_x = current_offset_x
-    if offset_y is None:
-        offset_y = current_offset_y
-
-    # Check if the face value is changing
-    if face is None:
-        face = current_face
-    elif face != current_face:  # Face has changed
-        previous_face = current_face
-        current_face = face  # Update global face state
-
-        # Determine target eyelid positions based on the new face
-        if face == "happy":
-            target_eyelid_heights = {
-                "top_inner_left": 0,
-                "top_outer_left": 0,
-                "bottom_left": config["eye"]["left"]["height"] // 2,
-                "top_inner_right": 0,
-                "top_outer_right": 0,
-                "bottom_right": config["eye"]["right"]["height"] // 2,
-            }
-        elif face == "angry":
-            target_eyelid_heights = {
-                "top_inner_left": config["eye"]["left"]["height"] // 2,
-                "top_outer_left": 0,
-                "bottom_left": 0,
-                "top_inner_right": config["eye"]["right"]["height"] // 2,
-                "top_outer_right": 0,
-                "bottom_right": 0,
-            }
-        elif face == "tired":
-            target_eyelid_heights = {
-                "top_inner_left": 0,
-                "top_outer_left": config["eye"]["left"]["height"] // 2,
-                "bottom_left": 0,
-                "top_inner_right": 0,
-                "top_outer_right": config["eye"]["right"]["height"] // 2,
-                "bottom_right": 0,
-            }
-        else:  # Default to fully open state
-            target_eyelid_heights = {
-                "top_inner_left": 0,
-                "top_outer_left": 0,
-                "bottom_left": 0,
-                "top_inner_right": 0,
-                "top_outer_right": 0,
-                "bottom_right": 0,
-            }
+    :param image: Frame to display
+    :param bg_color: Background color for color screens
+    :param eye_color: Eye color for color screens
+    :param bbox: Area of the eyes in the frame as (x0, y0, x1, y1), None to send the full frame
+    """
+    # Skip frames with the same pixels and colors as the last one sent, the bus is the slowest part
+    last_frame = (image.tobytes(), bg_color, eye_color)
+    if getattr(device, "_eye_last_buf", None) == last_frame:
+        return
+    device._eye_last_buf = last_frame
+
+    prev_bbox = getattr(device, "_eye_prev_bbox", None)
+    device._eye_prev_bbox = bbox
+    dirty = None
+    if bbox is not None and prev_bbox is not None:
+        dirty = (
+            max(0, min(bbox[0], prev_bbox[0])),
+            max(0, min(bbox[1], prev_bbox[1])),
+            min(image.width - 1, max(bbox[2], prev_bbox[2])),
+            min(image.height - 1, max(bbox[3], prev_bbox[3])),
+        )
+        if dirty[0] > dirty[2] or dirty[1] > dirty[3]:
+            return
 
-        # Adjust eyelids dynamically
-        adjustment_speed = 2  # Pixels per frame
-        current_eyelid_positions = {
-            "top_inner_left": 0,
-            "top_outer_left": 0,
-            "bottom_left": 0,
-            "top_inner_right": 0,
-            "top_outer_right": 0,
-            "bottom_right": 0,
-        }
-
-        while any(
-            current_eyelid_positions[key] != target_eyelid_heights[key]
-            for key in target_eyelid_heights
-        ):
-            for key in current_eyelid_positions:
-                if current_eyelid_positions[key] < target_eyelid_heights[key]:
-                    current_eyelid_positions[key] = min(
-                        current_eyelid_positions[key] + adjustment_speed,
-                        target_eyelid_heights[key],
-                    )
-                elif current_eyelid_positions[key] > target_eyelid_heights[key]:
-                    current_eyelid_positions[key] = max(
-                        current_eyelid_positions[key] - adjustment_speed,
-                        target_eyelid_heights[key],
-                    )
-
-            # Render the frame
-            draw_eyes(
-                device,
-                config,
-                offset_x=current_offset_x,
-                offset_y=current_offset_y,
-                blink_height_left=blink_height_left,
-                blink_height_right=blink_height_right,
-                face=face,
-                curious=current_curious,
-                command=None,  # Prevent recursion
+    if device.mode != "1":
+        # Recolor only the dirty area of the frame kept on the device, luma keeps its own copy to diff against
+        frame = getattr(device, "_eye_frame", None)
+        if frame is None or dirty is None or device._eye_colors != (bg_color, eye_color):
+            frame = device._eye_frame = Image.composite(
+                _color_layer(device.mode, image.size, eye_color),
+                _color_layer(device.mode, image.size, bg_color),
+                image,
             )
-            time.sleep(1 / config["render"].get("fps", 30))
+            device._eye_colors = (bg_color, eye_color)
+        else:
+            box = (dirty[0], dirty[1], dirty[2] + 1, dirty[3] + 1)
+            frame.paste(bg_color, box)
+            frame.paste(eye_color, box, image.crop(box))
+        device.display(frame.copy())
+        return
+    if type(device).__name__ not in PAGE_PACKED_DRIVERS:
+        device.display(image)
+        return
+
+    image = device.preprocess(image)
+    width = device._w
+    pages = device._pages
+
+    # Write the pages and columns of the dirty area, rotated screens are always written in full
+    x0, page0, x1, page1 = 0, 0, width - 1, pages - 1
+    if dirty is not None and device.rotate == 0:
+        x0, page0, x1, page1 = dirty[0], dirty[1] // 8, dirty[2], dirty[3] // 8
+
+    # Rotating clockwise turns each column of a page into one byte with the top pixel as the LSB
+    packed = image.transpose(Image.Transpose.ROTATE_270).tobytes()
+    columns = x1 - x0 + 1
+    buf = bytearray(columns * (page1 - page0 + 1))
+    for i, page in enumerate(range(page0, page1 + 1)):
+        buf[i * columns:(i + 1) * columns] = packed[pages - 1 - page + x0 * pages:(x1 + 1) * pages:pages]
+
+    device.command(
+        device._const.COLUMNADDR, device._colstart + x0, device._colstart + x1,
+        device._const.PAGEADDR, page0, page1,
+    )
+    device.data(list(buf))
 
-        return  # Exit after adjustment
+def _display_worker(device, frames):
+    """
+    Send queued frames to the display, run in a daemon thread per device.
+    :param device: Display device
+    :param frames: Queue of display_frame arguments
+    """
+    while True:
+        args = frames.get()
+        try:
+            display_frame(device, *args)
+        except Exception as e:
+            logger.error("Error sending frame to the display: %s", e)
+        finally:
+            frames.task_done()
+
+def queue_frame(device, image, bg_color="black", eye_color="white", bbox=None):
+    """
+    Queue a frame for the display thread of the device, so rendering does not wait for the bus.
+    The thread sends one frame while the next one is rendered, a frame still waiting when a newer one arrives is dropped.
+    The frame must not be changed afterwards.
+    :param device: Display device
+    :param image: Frame to display
+    :param bg_color: Background color for color screens
+    :param eye_color: Eye color for color screens
+    :param bbox: Area of the eyes in the frame
+    """
+    frames = getattr(device, "_eye_queue", None)
+    if frames is None:
+        frames = device._eye_queue = queue.Queue(maxsize=DISPLAY_QUEUE_SIZE)
+        threading.Thread(target=_display_worker, args=(device, frames), daemon=True).start()
+
+    item = (image, bg_color, eye_color, bbox)
+    while True:
+        try:
+            frames.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                frames.get_nowait()
+                frames.task_done()
+            except queue.Empty:
+                pass
+
+def wait_display(device):
+    """
+    Wait until all queued frames have been sent to the display.
+    :param device: Display device
+    """
+    frames = getattr(device, "_eye_queue", None)
+    if frames is not None:
+        frames.join()
 
-    # Default to global curious state if not explicitly provided
-    if curious is None:
-        curious = current_curious
-    else:
-        current_curious = curious  # Update global curious state
-        
-    if closed is None:
-        closed = current_closed
-    else:
-        current_closed = closed  # Update global closed state
+@dataclass(slots=True)
+class EyeState:
+    """
+    Everything needed to render a single frame of the eyes.
+    """
+    offset_x: int = 0
+    offset_y: int = 0
+    bh_l: int = None  # Height of the left eye during animations, None for the configured height
+    bh_r: int = None  # Height of the right eye during animations, None for the configured height
+    face: str = "default"
+    curious: bool = False
+    closed: str = None
+    bg_color: str = "black"
+    eye_color: str = "white"
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RenderContext:
+    """
+    Config and device derived constants used on every frame, built once per device and configuration.
+    Contexts compare and hash by identity, so they are cheap to use as cache keys.
+    """
+    sw: int  # Screen width
+    sh: int  # Screen height
+    cy: int  # Vertical center of the screen
+    lx: int  # Inner edge of the left eye without offset
+    rx: int  # Inner edge of the right eye without offset
+    lew: int  # Left eye width
+    leh: int  # Left eye height
+    rew: int  # Right eye width
+    reh: int  # Right eye height
+    lr: int  # Left eye roundness
+    rr: int  # Right eye roundness
+    curious_scale: int  # Curious mode sizes change by twice the offset divided by this
+    frame_time: float  # Seconds per frame
+    min_x: int  # Smallest horizontal offset covered by the curious table
+    max_x: int  # Largest horizontal offset covered by the curious table
+    curious_table: tuple  # Curious mode size deltas for every offset between min_x and max_x
+    constraints: tuple  # Movement constraints (min_x_offset, max_x_offset, min_y_offset, max_y_offset)
+
+def _curious_deltas(curious_scale, offset_x, width_left, width_right, height_left, height_right):
+    """
+    Calculate the size changes of the eyes in curious mode, the eye on the side of the movement grows, the other shrinks.
+    :param curious_scale: Sizes change by twice the offset divided by this, 40% at half the screen width
+    :return: A tuple of (width_left, width_right, height_left, height_right) deltas
+    """
+    distance = 2 * abs(offset_x)
+    deltas = (
+        distance * width_left // curious_scale,
+        distance * width_right // curious_scale,
+        distance * height_left // curious_scale,
+        distance * height_right // curious_scale,
+    )
+    if offset_x < 0:  # Moving left
+        return deltas[0], -deltas[1], deltas[2], -deltas[3]
+    if offset_x > 0:  # Moving right
+        return -deltas[0], deltas[1], -deltas[2], deltas[3]
+    return 0, 0, 0, 0
 
-    # Dynamically create an image based on the device mode
-    image = Image.new(device.mode, (device.width, device.height), bg_color)
-    draw = ImageDraw.Draw(image)
+def build_render_ctx(device, config):
+    """
+    Collect the values needed for rendering from the device and the configuration.
+    The context is kept on the device with the configuration it was built from, and reused for the same configuration.
+    :param device: Display device
+    :param config: Configuration dictionary
+    :return: RenderContext
+    """
+    cached = getattr(device, "_eye_ctx", None)
+    if cached is not None and cached[0] is config:
+        return cached[1]
 
-    # Eye parameters
     left_eye = config["eye"]["left"]
     right_eye = config["eye"]["right"]
     distance = config["eye"]["distance"]
+    # Max increase by 40% (2/5) in curious mode at half the screen width, kept as an integer divisor
+    curious_scale = 5 * (config["screen"]["width"] // 2)
+
+    # Precompute the curious size deltas for the horizontal movement range of the eyes
+    min_x = -(device.width // 2 - distance // 2 - left_eye["width"])
+    max_x = device.width // 2 - distance // 2 - right_eye["width"]
+    curious_table = tuple(
+        _curious_deltas(curious_scale, offset_x, left_eye["width"], right_eye["width"], left_eye["height"], right_eye["height"])
+        for offset_x in range(min_x, max_x + 1)
+    )
 
+    ctx = RenderContext(
+        sw=device.width,
+        sh=device.height,
+        cy=device.height // 2,
+        lx=device.width // 2 - distance // 2,
+        rx=device.width // 2 + distance // 2,
+        lew=left_eye["width"],
+        leh=left_eye["height"],
+        rew=right_eye["width"],
+        reh=right_eye["height"],
+        lr=left_eye["roundness"],
+        rr=right_eye["roundness"],
+        curious_scale=curious_scale,
+        frame_time=1 / config["render"].get("fps", 30),
+        min_x=min_x,
+        max_x=max_x,
+        curious_table=curious_table,
+        constraints=get_constraints(config, device),
+    )
+    device._eye_ctx = (config, ctx)
+    return ctx
+
+@functools.lru_cache(maxsize=64)
+def _eye_corners(roundness):
+    """
+    Draw the masks of the area outside the four rounded corners of an eye, once per roundness.
+    :param roundness: Roundness of the eye
+    :return: Tuple of the top left, top right, bottom left and bottom right corner masks
+    """
+    size = 2 * roundness + 3
+    corner = roundness + 1
+    outside = Image.new("1", (size, size), 1)
+    ImageDraw.Draw(outside).rounded_rectangle((0, 0, size - 1, size - 1), radius=roundness, outline=0, fill=0)
+    return (
+        outside.crop((0, 0, corner, corner)),
+        outside.crop((size - corner, 0, size, corner)),
+        outside.crop((0, size - corner, corner, size)),
+        outside.crop((size - corner, size - corner, size, size)),
+    )
+
+@functools.lru_cache(maxsize=512)
+def _eye_sprite(width, height, roundness):
+    """
+    Build the mask of a single eye, cached per eye size as only a few sizes are used during animations.
+    The corners are cut out of a filled rectangle with the cached corner masks, only eyes so small that
+    the corners meet are drawn with rounded_rectangle.
+    :param width: Width of the eye in pixels
+    :param height: Height of the eye in pixels
+    :param roundness: Roundness of the eye
+    :return: Mask of the eye
+    """
+    if 2 * roundness >= width - 2 or 2 * roundness >= height - 2:
+        sprite = Image.new("1", (width, height), 0)
+        ImageDraw.Draw(sprite).rounded_rectangle((0, 0, width - 1, height - 1), radius=roundness, outline=1, fill=1)
+        return sprite
+
+    sprite = Image.new("1", (width, height), 1)
+    corner = roundness + 1
+    top_left, top_right, bottom_left, bottom_right = _eye_corners(roundness)
+    sprite.paste(0, (0, 0), top_left)
+    sprite.paste(0, (width - corner, 0), top_right)
+    sprite.paste(0, (0, height - corner), bottom_left)
+    sprite.paste(0, (width - corner, height - corner), bottom_right)
+    return sprite
+
+def _eyelid_mask(side, face, width, eye_height, roundness):
+    """
+    Get the eyelid mask of an eye for a face, drawn once per face and eye size and cached.
+    :param side: Which eye the mask is for ("left" or "right")
+    :param face: Face setting the eyelids ("happy", "angry", "tired")
+    :param width: Width of the eye in pixels
+    :param eye_height: Height of the eye
+    :param roundness: Roundness of the eye
+    :return: Mask relative to the top left corner of the eye, or None if the face has no eyelids
+    """
+    key = (side, face, width, eye_height, roundness)
+    if key in _eyelid_cache:
+        return _eyelid_cache[key]
+
+    # Face-based eyelid heights
+    eyelid_bottom_height = 0
+    eyelid_top_inner_height = 0
+    eyelid_top_outer_height = 0
+    if face == "happy":
+        eyelid_bottom_height = eye_height // 2
+    elif face == "angry":
+        eyelid_top_inner_height = eye_height // 2
+    elif face == "tired":
+        eyelid_top_outer_height = eye_height // 2
+    else:
+        _eyelid_cache[key] = None
+        return None
+
+    height = eye_height // 2 * 2 + 1
+    mask = Image.new("1", (width, height), 0)
+    draw = ImageDraw.Draw(mask)
+
+    # Draw top eyelid, the inner corner of the left eye is on the right side
+    if eyelid_top_inner_height > 0 or eyelid_top_outer_height > 0:
+        if side == "left":
+            eyelid_top_left_height, eyelid_top_right_height = eyelid_top_outer_height, eyelid_top_inner_height
+        else:
+            eyelid_top_left_height, eyelid_top_right_height = eyelid_top_inner_height, eyelid_top_outer_height
+        draw.polygon([
+            (0, 0),
+            (width - 1, 0),
+            (width - 1, eyelid_top_right_height),
+            (0, eyelid_top_left_height),
+        ], fill=1)
+
+    # Draw bottom eyelid
+    if eyelid_bottom_height > 0:
+        draw.rounded_rectangle(
+            (0, height - 1 - eyelid_bottom_height, width - 1, height - 1),
+            radius=roundness,
+            outline=1,
+            fill=1,
+        )
+
+    _eyelid_cache[key] = mask
+    return mask
+
+@functools.lru_cache(maxsize=1024)
+def _compute_geometry(ctx, offset_x, offset_y, bh_l, bh_r, closed, curious):
+    """
+    Calculate the position and size of the eyes for a frame, using integer math only.
+    Results are cached, as animations keep passing through the same positions and heights.
+    :param ctx: RenderContext of the device and configuration
+    :param offset_x: Horizontal offset of the eyes
+    :param offset_y: Vertical offset of the eyes
+    :param bh_l: Height of the left eye during animations, None for the configured height
+    :param bh_r: Height of the right eye during animations, None for the configured height
+    :param closed: Which eyes are closed ("left", "right", "both" or None)
+    :param curious: If True, adjust eye sizes based on position
+    :return: Tuple of the left and right eye coordinates (x0, y0, x1, y1) and the left and right eye heights
+    """
     # Base dimensions for eyes
-    eye_width_left = left_eye["width"]
-    eye_width_right = right_eye["width"]
-    
-    if blink_height_left is not None or blink_height_right is not None:  # Animation in progress
-        eye_height_left = blink_height_left if blink_height_left is not None else left_eye["height"]
-        eye_height_right = blink_height_right if blink_height_right is not None else right_eye["height"]
+    eye_width_left = ctx.lew
+    eye_width_right = ctx.rew
+
+    if bh_l is not None or bh_r is not None:  # Animation in progress
+        eye_height_left = bh_l if bh_l is not None else ctx.leh
+        eye_height_right = bh_r if bh_r is not None else ctx.reh
     elif closed == "both":
         eye_height_left = 1
         eye_height_right = 1
     elif closed == "left":
         eye_height_left = 1
-        eye_height_right = right_eye["height"]
+        eye_height_right = ctx.reh
     elif closed == "right":
-        eye_height_left = left_eye["height"]
+        eye_height_left = ctx.leh
         eye_height_right = 1
     else:  # Open state
-        eye_height_left = left_eye["height"]
-        eye_height_right = right_eye["height"]
+        eye_height_left = ctx.leh
+        eye_height_right = ctx.reh
 
     # Apply curious effect dynamically
     if curious:
-        max_increase = 0.4  # Max increase by 40%
-        scale_factor = max_increase / (config["screen"]["width"] // 2)
-        if offset_x < 0:  # Moving left
-            eye_width_left += int(scale_factor * abs(offset_x) * left_eye["width"])
-            eye_width_right -= int(scale_factor * abs(offset_x) * right_eye["width"])
-            eye_height_left += int(scale_factor * abs(offset_x) * eye_height_left)
-            eye_height_right -= int(scale_factor * abs(offset_x) * eye_height_right)
-        elif offset_x > 0:  # Moving right
-            eye_height_left -= int(scale_factor * abs(offset_x) * eye_height_left)
-            eye_height_right += int(scale_factor * abs(offset_x) * eye_height_right)
-            eye_width_left -= int(scale_factor * abs(offset_x) * left_eye["width"])
-            eye_width_right += int(scale_factor * abs(offset_x) * right_eye["width"])
+        if ctx.min_x <= offset_x <= ctx.max_x:
+            delta_w_l, delta_w_r, delta_h_l, delta_h_r = ctx.curious_table[offset_x - ctx.min_x]
+        else:
+            delta_w_l, delta_w_r, delta_h_l, delta_h_r = _curious_deltas(
+                ctx.curious_scale, offset_x, ctx.lew, ctx.rew, ctx.leh, ctx.reh
+            )
+        # The table holds height deltas for the configured heights, animated heights need their own
+        if eye_height_left != ctx.leh or eye_height_right != ctx.reh:
+            _, _, delta_h_l, delta_h_r = _curious_deltas(
+                ctx.curious_scale, offset_x, 0, 0, eye_height_left, eye_height_right
+            )
+        eye_width_left += delta_w_l
+        eye_width_right += delta_w_r
+        eye_height_left += delta_h_l
+        eye_height_right += delta_h_r
 
     # Clamp sizes to ensure no negative or unrealistic dimensions
     eye_height_left = max(2, eye_height_left)
@@ -340,324 +671,474 @@ def draw_eyes(device, config, bg_color=None, eye_color=None, offset_x=None, offs
     eye_width_left = max(2, eye_width_left)
     eye_width_right = max(2, eye_width_right)
 
-    roundness_left = left_eye["roundness"]
-    roundness_right = right_eye["roundness"]
-
     # Calculate eye positions
+    left_x = ctx.lx + offset_x
+    right_x = ctx.rx + offset_x
+    cy = ctx.cy + offset_y
     left_eye_coords = (
-        device.width // 2 - eye_width_left - distance // 2 + offset_x,
-        device.height // 2 - eye_height_left // 2 + offset_y,
-        device.width // 2 - distance // 2 + offset_x,
-        device.height // 2 + eye_height_left // 2 + offset_y,
+        left_x - eye_width_left,
+        cy - eye_height_left // 2,
+        left_x,
+        cy + eye_height_left // 2,
     )
     right_eye_coords = (
-        device.width // 2 + distance // 2 + offset_x,
-        device.height // 2 - eye_height_right // 2 + offset_y,
-        device.width // 2 + eye_width_right + distance // 2 + offset_x,
-        device.height // 2 + eye_height_right // 2 + offset_y,
+        right_x,
+        cy - eye_height_right // 2,
+        right_x + eye_width_right,
+        cy + eye_height_right // 2,
     )
+    return left_eye_coords, right_eye_coords, eye_height_left, eye_height_right
 
-    draw.rounded_rectangle(left_eye_coords, radius=roundness_left, outline=eye_color, fill=eye_color)
-    draw.rounded_rectangle(right_eye_coords, radius=roundness_right, outline=eye_color, fill=eye_color)
-
-    # Default eyelid heights
-    eyelid_bottom_left_height = 0
-    eyelid_bottom_right_height = 0
-    eyelid_top_inner_left_height = 0
-    eyelid_top_inner_right_height = 0
-    eyelid_top_outer_left_height = 0
-    eyelid_top_outer_right_height = 0
-
-    # Face-based eyelid adjustments
-    if current_face == "happy":
-        eyelid_bottom_left_height = eye_height_left // 2
-        eyelid_bottom_right_height = eye_height_right // 2
-    elif current_face == "angry":
-        eyelid_top_inner_left_height = eye_height_left // 2
-        eyelid_top_inner_right_height = eye_height_right // 2
-    elif current_face == "tired":
-        eyelid_top_outer_left_height = eye_height_left // 2
-        eyelid_top_outer_right_height = eye_height_right // 2
-
-    # Draw top eyelids
-    if eyelid_top_inner_left_height or eyelid_top_outer_left_height > 0:
-        draw.polygon([
-            (left_eye_coords[0], left_eye_coords[1]),
-            (left_eye_coords[2], left_eye_coords[1]),
-            (left_eye_coords[2], left_eye_coords[1] + eyelid_top_inner_left_height),
-            (left_eye_coords[0], left_eye_coords[1] + eyelid_top_outer_left_height),
-        ], fill=bg_color)
+def _device_blank(device, ctx):
+    """
+    Get the blank frame of the device, setting up the render state kept on the device on first use.
+    :param device: Display device
+    :param ctx: RenderContext of the device and configuration
+    :return: Blank mode "1" frame of the device
+    """
+    blank = getattr(device, "_eye_blank", None)
+    if blank is None:
+        blank = device._eye_blank = Image.new("1", (ctx.sw, ctx.sh), 0)
+        device._eye_frames = collections.OrderedDict()
+        device._eye_stills = {}
+        device._eye_last_key = None
+    return blank
+
+def _draw_frame(blank, ctx, face, geometry):
+    """
+    Draw the eyes into a new frame.
+    Frames start from a copy of the blank frame instead of allocating and clearing a new image, they are cached
+    and sent from another thread so they are never changed once drawn.
+    Frames are always drawn in mode "1" and only colorized when sent to a color screen.
+    :param blank: Blank frame of the device
+    :param ctx: RenderContext of the device and configuration
+    :param face: Face setting the eyelids
+    :param geometry: Result of _compute_geometry for the frame
+    :return: Tuple of the frame and the area of the eyes in it as (x0, y0, x1, y1)
+    """
+    image = blank.copy()
+
+    left_eye_coords, right_eye_coords, eye_height_left, eye_height_right = geometry
+    roundness_left = ctx.lr
+    roundness_right = ctx.rr
+
+    # Paste the eyes from cached sprites instead of drawing the rounded rectangles
+    image.paste(1, left_eye_coords[:2], _eye_sprite(
+        left_eye_coords[2] - left_eye_coords[0] + 1, left_eye_coords[3] - left_eye_coords[1] + 1, roundness_left
+    ))
+    image.paste(1, right_eye_coords[:2], _eye_sprite(
+        right_eye_coords[2] - right_eye_coords[0] + 1, right_eye_coords[3] - right_eye_coords[1] + 1, roundness_right
+    ))
+
+    # Cover the eyes with the eyelids of the face, the default face has none
+    if face != "default":
+        mask = _eyelid_mask("left", face, left_eye_coords[2] - left_eye_coords[0] + 1, eye_height_left, roundness_left)
+        if mask is not None:
+            image.paste(0, left_eye_coords[:2], mask)
+        mask = _eyelid_mask("right", face, right_eye_coords[2] - right_eye_coords[0] + 1, eye_height_right, roundness_right)
+        if mask is not None:
+            image.paste(0, right_eye_coords[:2], mask)
+
+    bbox = (
+        left_eye_coords[0],
+        min(left_eye_coords[1], right_eye_coords[1]),
+        right_eye_coords[2],
+        max(left_eye_coords[3], right_eye_coords[3]),
+    )
+    return image, bbox
 
-    if eyelid_top_inner_right_height or eyelid_top_outer_right_height > 0:
-        draw.polygon([
-            (right_eye_coords[0], right_eye_coords[1]),
-            (right_eye_coords[2], right_eye_coords[1]),
-            (right_eye_coords[2], right_eye_coords[1] + eyelid_top_outer_right_height),
-            (right_eye_coords[0], right_eye_coords[1] + eyelid_top_inner_right_height),
-        ], fill=bg_color)
-
-    # Draw bottom eyelids
-    if eyelid_bottom_left_height > 0:
-        draw.rounded_rectangle(
-            (
-                left_eye_coords[0],
-                left_eye_coords[3] - eyelid_bottom_left_height,
-                left_eye_coords[2],
-                left_eye_coords[3],
-            ),
-            radius=roundness_left,
-            outline=bg_color,
-            fill=bg_color,
-        )
+def prerender_stills(device, ctx):
+    """
+    Draw the still poses of every face around the center of the screen once, so holding them needs no drawing.
+    Stills are kept on the device next to the recently rendered frames and are never evicted.
+    :param device: Display device
+    :param ctx: RenderContext of the device and configuration
+    """
+    blank = _device_blank(device, ctx)
+    min_x_offset, max_x_offset, min_y_offset, max_y_offset = ctx.constraints
+    for face in STILL_FACES:
+        for offset_y in STILL_OFFSETS:
+            for offset_x in STILL_OFFSETS:
+                if not (min_x_offset <= offset_x <= max_x_offset and min_y_offset <= offset_y <= max_y_offset):
+                    continue
+                geometry = _compute_geometry(ctx, offset_x, offset_y, None, None, None, False)
+                device._eye_stills[(face, geometry)] = _draw_frame(blank, ctx, face, geometry)
+
+def _render(device, ctx, state, geometry=None):
+    """
+    Render a single frame of the eyes from the given state and send it to the display.
+    :param device: Display device
+    :param ctx: RenderContext of the device and configuration
+    :param state: EyeState to render
+    :param geometry: Precomputed result of _compute_geometry for the state, computed here if None
+    """
+    blank = _device_blank(device, ctx)
+    rendered_frames = device._eye_frames
 
-    if eyelid_bottom_right_height > 0:
-        draw.rounded_rectangle(
-            (
-                right_eye_coords[0],
-                right_eye_coords[3] - eyelid_bottom_right_height,
-                right_eye_coords[2],
-                right_eye_coords[3],
-            ),
-            radius=roundness_right,
-            outline=bg_color,
-            fill=bg_color,
+    if geometry is None:
+        geometry = _compute_geometry(
+            ctx, state.offset_x, state.offset_y, state.bh_l, state.bh_r, state.closed, state.curious
         )
 
-    device.display(image)
-
-    if command == "look" and target_offset_x is not None and target_offset_y is not None:
-        # Define movement speed
-        movement_speed = {"fast": 8, "medium": 4, "slow": 2}.get(speed, 4)
-        while current_offset_x != target_offset_x or current_offset_y != target_offset_y:
-            # Calculate new offsets
-            if current_offset_x < target_offset_x:
-                current_offset_x = min(current_offset_x + movement_speed, target_offset_x)
-            elif current_offset_x > target_offset_x:
-                current_offset_x = max(current_offset_x - movement_speed, target_offset_x)
-
-            if current_offset_y < target_offset_y:
-                current_offset_y = min(current_offset_y + movement_speed, target_offset_y)
-            elif current_offset_y > target_offset_y:
-                current_offset_y = max(current_offset_y - movement_speed, target_offset_y)
-
-            # Determine eye heights based on `current_closed`
-            if current_closed == "both":
-                blink_height_left = 1
-                blink_height_right = 1
-            elif current_closed == "left":
-                blink_height_left = 1
-                blink_height_right = config["eye"]["right"]["height"]
-            elif current_closed == "right":
-                blink_height_left = config["eye"]["left"]["height"]
-                blink_height_right = 1
-            else:  # Open state
-                blink_height_left = config["eye"]["left"]["height"]
-                blink_height_right = config["eye"]["right"]["height"]
-
-            # Render the frame
-            draw_eyes(
-                device,
-                config,
-                offset_x=current_offset_x,
-                offset_y=current_offset_y,
-                blink_height_left=blink_height_left,
-                blink_height_right=blink_height_right,
-                face=current_face,
-                curious=curious,
-                closed=current_closed,
-            )
-
-            # Allow smooth animation
-            time.sleep(1 / config["render"].get("fps", 30))
-
-    # Handle blinking
-    if command == "blink":
-        left_eye_height_orig = config["eye"]["left"]["height"]
-        right_eye_height_orig = config["eye"]["right"]["height"]
-
-        # Default blink heights to original values if None
-        if blink_height_left is None:
-            blink_height_left = left_eye_height_orig
-        if blink_height_right is None:
-            blink_height_right = right_eye_height_orig
-
-        # Define the speed of animation in pixels per frame
-        movement_speed = {"fast": 12, "medium": 8, "slow": 4}.get(speed, 4)
-
-        blink_direction = -1  # Closing phase initially
-        while True:
-            if blink_direction == -1:  # Closing phase
-                # Adjust left eye height
-                if eye in ["both", "left"]:
-                    blink_height_left = max(1, blink_height_left - movement_speed)
-                # Adjust right eye height
-                if eye in ["both", "right"]:
-                    blink_height_right = max(1, blink_height_right - movement_speed)
-
-                # Check if both eyes are fully closed
-                if (
-                    (eye in ["both", "left"] and blink_height_left <= 1) and
-                    (eye in ["both", "right"] and blink_height_right <= 1)
-                ):
-                    blink_direction = 1  # Start opening phase
-
-                # If only one eye is blinking, start opening when it is fully closed
-                if eye == "left" and blink_height_left <= 1:
-                    blink_direction = 1
-                if eye == "right" and blink_height_right <= 1:
-                    blink_direction = 1
-
-            elif blink_direction == 1:  # Opening phase
-                # Adjust left eye height
-                if eye in ["both", "left"]:
-                    blink_height_left += movement_speed
-                    if blink_height_left >= left_eye_height_orig:
-                        blink_height_left = left_eye_height_orig  # Final adjustment
-                # Adjust right eye height
-                if eye in ["both", "right"]:
-                    blink_height_right += movement_speed
-                    if blink_height_right >= right_eye_height_orig:
-                        blink_height_right = right_eye_height_orig  # Final adjustment
-
-                # Check if both eyes are fully open
-                if (
-                    (eye in ["both", "left"] and blink_height_left >= left_eye_height_orig) and
-                    (eye in ["both", "right"] and blink_height_right >= right_eye_height_orig)
-                ):
-                    break
-
-                # If only one eye is blinking, stop when it is fully open
-                if eye == "left" and blink_height_left >= left_eye_height_orig:
-                    break
-                if eye == "right" and blink_height_right >= right_eye_height_orig:
-                    break
-
-            # Draw the current frame of the blink
-            draw_eyes(
-                device,
-                config,
-                offset_x=current_offset_x,
-                offset_y=current_offset_y,
-                blink_height_left=blink_height_left if eye in ["both", "left"] else None,
-                blink_height_right=blink_height_right if eye in ["both", "right"] else None,
-                face=current_face,
-                curious=curious,
-            )
-            # time.sleep(1 / config["render"].get("fps", 30))
-
-        # Final frame to ensure eyes are drawn at their original height
-        draw_eyes(
-            device,
-            config,
-            offset_x=current_offset_x,
-            offset_y=current_offset_y,
-            blink_height_left=left_eye_height_orig,
-            blink_height_right=right_eye_height_orig,
-            face=current_face,
-            curious=curious,
+    # Frames are keyed on the face and the resulting eye geometry, so states that end up with the same pixels
+    # share a frame. Nothing to do if the frame is the same as the last one, send it again if it is a still
+    # or was rendered recently
+    key = (state.face, geometry)
+    if device._eye_last_key == (key, state.bg_color, state.eye_color):
+        return
+    device._eye_last_key = (key, state.bg_color, state.eye_color)
+    if _TRACE and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Rendering frame: face=%s offset=(%d, %d) heights=(%s, %s) curious=%s closed=%s",
+            state.face, state.offset_x, state.offset_y, state.bh_l, state.bh_r, state.curious, state.closed,
         )
+    cached = device._eye_stills.get(key)
+    if cached is None:
+        cached = rendered_frames.get(key)
+        if cached is not None:
+            rendered_frames.move_to_end(key)
+    if cached is not None:
+        queue_frame(device, cached[0], state.bg_color, state.eye_color, cached[1])
+        return
+
+    image, bbox = _draw_frame(blank, ctx, state.face, geometry)
+    rendered_frames[key] = (image, bbox)
+    if len(rendered_frames) > RENDERED_FRAME_CACHE_SIZE:
+        rendered_frames.popitem(last=False)
+    queue_frame(device, image, state.bg_color, state.eye_color, bbox)
+
+def _frame_clock(n_frames, frame_time):
+    """
+    Pace the frames of an animation on the monotonic clock.
+    The frame number is worked out from the time since the start, so frames the caller fell behind on are skipped
+    and only the current position is rendered.
+    :param n_frames: Number of frames in the animation
+    :param frame_time: Time of a single frame in seconds
+    :return: Generator of the frame numbers to render, from 1 up to and always including n_frames
+    """
+    start = time.monotonic()
+    frame = 0
+    while frame < n_frames:
+        frame = min(n_frames, max(frame + 1, int((time.monotonic() - start) / frame_time) + 1))
+        yield frame
+        # Wait for the next frame, minus the time spent on rendering
+        time.sleep(max(0, start + frame * frame_time - time.monotonic()))
+
+@functools.lru_cache(maxsize=32)
+def _anim_heights(start_left, start_right, end_left, end_right, step, eye):
+    """
+    Step the height of the selected eyes towards the target heights, cached as the same animations repeat.
+    :param start_left: Starting height of the left eye
+    :param start_right: Starting height of the right eye
+    :param end_left: Target height of the left eye
+    :param end_right: Target height of the right eye
+    :param step: Pixels per frame
+    :param eye: Which eye to animate ("left", "right", or "both"), the other one keeps its starting height
+    :return: Tuple of (height_left, height_right) for every frame until the animated eyes reach their targets
+    """
+    heights = []
+    height_left = start_left
+    height_right = start_right
+    move_left = eye in ["both", "left"]
+    move_right = eye in ["both", "right"]
+    while (move_left and height_left != end_left) or (move_right and height_right != end_right):
+        if move_left:
+            if height_left < end_left:
+                height_left = min(height_left + step, end_left)
+            else:
+                height_left = max(height_left - step, end_left)
+        if move_right:
+            if height_right < end_right:
+                height_right = min(height_right + step, end_right)
+            else:
+                height_right = max(height_right - step, end_right)
+        heights.append((height_left, height_right))
+    return tuple(heights)
+
+@functools.lru_cache(maxsize=32)
+def _blink_schedule(start_left, start_right, end_left, end_right, step, eye):
+    """
+    Get the heights of a blink, closing the selected eyes and opening them again to the target heights.
+    :param start_left: Starting height of the left eye
+    :param start_right: Starting height of the right eye
+    :param end_left: Height of the left eye after the blink
+    :param end_right: Height of the right eye after the blink
+    :param step: Pixels per frame
+    :param eye: Which eye to blink ("left", "right", or "both"), the other one keeps its starting height
+    :return: Tuple of (height_left, height_right) for every frame of the blink
+    """
+    closed_left = 1 if eye in ["both", "left"] else start_left
+    closed_right = 1 if eye in ["both", "right"] else start_right
+    return (
+        _anim_heights(start_left, start_right, 1, 1, step, eye)
+        + _anim_heights(closed_left, closed_right, end_left, end_right, step, eye)
+    )
 
-    # Handle eye closing
-    if command == "close":
-        # Default blink heights to original values if None
-        left_eye_height_orig = config["eye"]["left"]["height"]
-        right_eye_height_orig = config["eye"]["right"]["height"]
-        if blink_height_left is None:
-            blink_height_left = left_eye_height_orig
-        if blink_height_right is None:
-            blink_height_right = right_eye_height_orig
-
-        # Define the speed of animation in pixels per frame
-        movement_speed = {"fast": 12, "medium": 8, "slow": 4}.get(speed, 4)
-        while True:
-            if eye in ["both", "left"]:
-                blink_height_left = max(1, blink_height_left - movement_speed)
-            if eye in ["both", "right"]:
-                blink_height_right = max(1, blink_height_right - movement_speed)
-
-            # Draw the current frame of the close animation
-            draw_eyes(
-                device,
-                config,
-                offset_x=current_offset_x,
-                offset_y=current_offset_y,
-                blink_height_left=blink_height_left,
-                blink_height_right=blink_height_right,
-                face=current_face,
-                curious=current_curious,
-            )
-
-            # Break when the eyes are fully closed
-            if (blink_height_left <= 1 and eye in ["both", "left"]) and (
-                blink_height_right <= 1 and eye in ["both", "right"]
-            ):
-                current_closed = "both"  # Update state to closed
-                break
-            elif blink_height_left <= 1 and eye in ["both", "left"]:
-                current_closed = "left"  # Update state to closed
-                break
-            elif blink_height_right <= 1 and eye in ["both", "right"]:
-                current_closed = "right"  # Update state to closed
-                break
-
-    # Handle eye opening
-    elif command == "open":
-        if not current_closed:  # If eyes are already open, skip animation
-            logging.warning("Eyes are already open. Skipping animation.")
-            return
+@functools.lru_cache(maxsize=64)
+def _look_schedule(start_x, start_y, target_x, target_y, step):
+    """
+    Get the offsets of a look animation, moving both axes along a straight line in the number of frames
+    the longer one needs. Cached, as the eyes keep moving between the same few positions.
+    :param start_x: Starting horizontal offset
+    :param start_y: Starting vertical offset
+    :param target_x: Target horizontal offset
+    :param target_y: Target vertical offset
+    :param step: Pixels per frame
+    :return: Tuple of (offset_x, offset_y) for every frame, ending at the target
+    """
+    dx = target_x - start_x
+    dy = target_y - start_y
+    n_frames = max(-(-abs(dx) // step), -(-abs(dy) // step))
+    return tuple(
+        (start_x + dx * frame // n_frames, start_y + dy * frame // n_frames)
+        for frame in range(1, n_frames + 1)
+    )
 
-        # Default blink heights based on current_closed state
-        left_eye_height_orig = config["eye"]["left"]["height"]
-        right_eye_height_orig = config["eye"]["right"]["height"]
-
-        # Ensure blink heights are initialized to their closed state
-        if current_closed == "both":
-            blink_height_left = 1
-            blink_height_right = 1
-        elif current_closed == "left":
-            blink_height_left = 1
-            blink_height_right = right_eye_height_orig
-        elif current_closed == "right":
-            blink_height_left = left_eye_height_orig
-            blink_height_right = 1
-        else:
-            # If eyes are already open, no need for animation
-            logging.info("Eyes are already open. Skipping opening animation.")
-            return
+def _play_heights(device, ctx, state, heights):
+    """
+    Render the eye heights of a blink, close or open animation, one per frame on the frame clock.
+    Frames are sent in the background, so the animation is paced here and frames it fell behind on are dropped.
+    :param device: Display device
+    :param ctx: RenderContext of the device and configuration
+    :param state: EyeState to render, its eye heights are updated for every frame
+    :param heights: Tuple of (height_left, height_right) for every frame
+    """
+    for frame in _frame_clock(len(heights), ctx.frame_time):
+        state.bh_l, state.bh_r = heights[frame - 1]
+        _render(device, ctx, state)
 
-        # Define the speed of animation in pixels per frame
-        movement_speed = {"fast": 12, "medium": 8, "slow": 4}.get(speed, 4)
-
-        while True:
-            if eye in ["both", "left"]:
-                blink_height_left = min(left_eye_height_orig, blink_height_left + movement_speed)
-            if eye in ["both", "right"]:
-                blink_height_right = min(right_eye_height_orig, blink_height_right + movement_speed)
-
-            # Draw the current frame of the open animation
-            draw_eyes(
-                device,
-                config,
-                offset_x=current_offset_x,
-                offset_y=current_offset_y,
-                blink_height_left=blink_height_left,
-                blink_height_right=blink_height_right,
-                face=current_face,
-                curious=current_curious,
+class EyeController:
+    """
+    Keep track of the state of the eyes between commands and animate them on the display.
+    """
+    __slots__ = ("offset_x", "offset_y", "face", "curious", "closed", "bg_color", "eye_color", "ctx", "device")
+
+    def __init__(self, device, config):
+        """
+        :param device: Display device
+        :param config: Configuration dictionary
+        """
+        self.device = device
+        self.ctx = build_render_ctx(device, config)
+        prerender_stills(device, self.ctx)
+        self.offset_x = 0
+        self.offset_y = 0
+        self.face = "default"
+        self.curious = False
+        self.closed = None
+        # Default black background and yellow eyecolor when using a color screen
+        self.bg_color = "black"
+        self.eye_color = "yellow"
+
+    def draw(self, bg_color=None, eye_color=None, offset_x=None, offset_y=None, blink_height_left=None, blink_height_right=None,
+             face=None, curious=None, command=None, target_offset_x=None, target_offset_y=None, speed=1,
+             eye="both", closed=None):
+        """
+        Draw the eyes on the display with optional face-based eyelids and support for curious mode.
+        Automatically adjusts eyelids when the face value changes.
+        Animations update a single EyeState and render it frame by frame with _render.
+
+        :param offset_x: Horizontal offset for eye movement (optional, defaults to the current offset)
+        :param offset_y: Vertical offset for eye movement (optional, defaults to the current offset)
+        :param blink_height_left: Current height of the left eye for blinking
+        :param blink_height_right: Current height of the right eye for blinking
+        :param face: Optional face parameter to adjust eyelids
+        :param curious: If True, adjust eye sizes based on position
+        :param command: Command to execute ("look", "blink", "close", "open" or None)
+        :param target_offset_x: Target horizontal offset for look animations
+        :param target_offset_y: Target vertical offset for look animations
+        :param speed: Speed index of the animation (0 fast, 1 medium, 2 slow)
+        :param eye: Specify which eye to blink ("left", "right", or "both")
+        """
+        device = self.device
+        ctx = self.ctx
+
+        if device.mode == "1":  # Monochrome OLED
+            bg_color = "black"
+            eye_color = "white"
+        else:  # Color LCD
+            bg_color = bg_color or self.bg_color
+            eye_color = eye_color or self.eye_color
+
+        # Default to the current offsets if not explicitly provided
+        offset_x = offset_x if offset_x is not None else self.offset_x
+        offset_y = offset_y if offset_y is not None else self.offset_y
+
+        # Check if the face value is changing
+        if face is not None and face != self.face:
+            self.face = face
+
+            # Determine target eyelid positions based on the new face
+            if face == "happy":
+                target_eyelid_heights = {
+                    "top_inner_left": 0,
+                    "top_outer_left": 0,
+                    "bottom_left": ctx.leh // 2,
+                    "top_inner_right": 0,
+                    "top_outer_right": 0,
+                    "bottom_right": ctx.reh // 2,
+                }
+            elif face == "angry":
+                target_eyelid_heights = {
+                    "top_inner_left": ctx.leh // 2,
+                    "top_outer_left": 0,
+                    "bottom_left": 0,
+                    "top_inner_right": ctx.reh // 2,
+                    "top_outer_right": 0,
+                    "bottom_right": 0,
+                }
+            elif face == "tired":
+                target_eyelid_heights = {
+                    "top_inner_left": 0,
+                    "top_outer_left": ctx.leh // 2,
+                    "bottom_left": 0,
+                    "top_inner_right": 0,
+                    "top_outer_right": ctx.reh // 2,
+                    "bottom_right": 0,
+                }
+            else:  # Default to fully open state
+                target_eyelid_heights = {
+                    "top_inner_left": 0,
+                    "top_outer_left": 0,
+                    "bottom_left": 0,
+                    "top_inner_right": 0,
+                    "top_outer_right": 0,
+                    "bottom_right": 0,
+                }
+
+            # Adjust eyelids dynamically
+            adjustment_speed = 2  # Pixels per frame
+            current_eyelid_positions = {
+                "top_inner_left": 0,
+                "top_outer_left": 0,
+                "bottom_left": 0,
+                "top_inner_right": 0,
+                "top_outer_right": 0,
+                "bottom_right": 0,
+            }
+            state = EyeState(
+                self.offset_x, self.offset_y, blink_height_left, blink_height_right,
+                face, self.curious, self.closed, bg_color, eye_color,
             )
 
-            # Break when the eyes are fully open
-            if (blink_height_left >= left_eye_height_orig and eye in ["both", "left"]) and (
-                blink_height_right >= right_eye_height_orig and eye in ["both", "right"]
+            while any(
+                current_eyelid_positions[key] != target_eyelid_heights[key]
+                for key in target_eyelid_heights
             ):
-                current_closed = None  # Update state to open
-                break
-            elif blink_height_left >= left_eye_height_orig and eye in ["both", "left"]:
-                current_closed = "right" if current_closed == "both" else None  # Only right remains closed
-                break
-            elif blink_height_right >= right_eye_height_orig and eye in ["both", "right"]:
-                current_closed = "left" if current_closed == "both" else None  # Only left remains closed
-                break
+                for key in current_eyelid_positions:
+                    if current_eyelid_positions[key] < target_eyelid_heights[key]:
+                        current_eyelid_positions[key] = min(
+                            current_eyelid_positions[key] + adjustment_speed,
+                            target_eyelid_heights[key],
+                        )
+                    elif current_eyelid_positions[key] > target_eyelid_heights[key]:
+                        current_eyelid_positions[key] = max(
+                            current_eyelid_positions[key] - adjustment_speed,
+                            target_eyelid_heights[key],
+                        )
+
+                # Render the frame
+                _render(device, ctx, state)
+                time.sleep(ctx.frame_time)
+
+            return  # Exit after adjustment
+
+        # Keep the current curious and closed state if not explicitly provided
+        self.curious = curious if curious is not None else self.curious
+        self.closed = closed if closed is not None else self.closed
+
+        state = EyeState(
+            offset_x, offset_y, blink_height_left, blink_height_right,
+            self.face, self.curious, self.closed, bg_color, eye_color,
+        )
+        _render(device, ctx, state)
+
+        if command == "look" and target_offset_x is not None and target_offset_y is not None:
+            # Define movement speed
+            movement_speed = LOOK_STEPS[speed]
+
+            # Determine eye heights based on the closed state
+            if self.closed == "both":
+                state.bh_l = 1
+                state.bh_r = 1
+            elif self.closed == "left":
+                state.bh_l = 1
+                state.bh_r = ctx.reh
+            elif self.closed == "right":
+                state.bh_l = ctx.leh
+                state.bh_r = 1
+            else:  # Open state
+                state.bh_l = ctx.leh
+                state.bh_r = ctx.reh
+
+            # The whole trajectory is known up front, so work out the geometry of every frame before rendering
+            offsets = _look_schedule(self.offset_x, self.offset_y, target_offset_x, target_offset_y, movement_speed)
+            trajectory = [
+                _compute_geometry(ctx, x, y, state.bh_l, state.bh_r, self.closed, self.curious)
+                for x, y in offsets
+            ]
+            for frame in _frame_clock(len(offsets), ctx.frame_time):
+                state.offset_x, state.offset_y = offsets[frame - 1]
+                _render(device, ctx, state, trajectory[frame - 1])
+
+            self.offset_x = state.offset_x = target_offset_x
+            self.offset_y = state.offset_y = target_offset_y
+
+        # Handle blinking
+        if command == "blink":
+            left_eye_height_orig = ctx.leh
+            right_eye_height_orig = ctx.reh
+
+            # Default blink heights to original values if None
+            if blink_height_left is None:
+                blink_height_left = left_eye_height_orig
+            if blink_height_right is None:
+                blink_height_right = right_eye_height_orig
+
+            # Define the speed of animation in pixels per frame
+            movement_speed = BLINK_STEPS[speed]
+
+            # Close the blinking eyes, then open them again to their original height
+            _play_heights(device, ctx, state, _blink_schedule(
+                blink_height_left, blink_height_right, left_eye_height_orig, right_eye_height_orig, movement_speed, eye
+            ))
+
+        # Handle eye closing
+        if command == "close":
+            # Default blink heights to original values if None
+            if blink_height_left is None:
+                blink_height_left = ctx.leh
+            if blink_height_right is None:
+                blink_height_right = ctx.reh
+
+            # Define the speed of animation in pixels per frame
+            movement_speed = BLINK_STEPS[speed]
+            _play_heights(device, ctx, state, _anim_heights(blink_height_left, blink_height_right, 1, 1, movement_speed, eye))
+            self.closed = eye  # Update state to closed
+
+        # Handle eye opening
+        elif command == "open":
+            if not self.closed:  # If eyes are already open, skip animation
+                logger.warning("Eyes are already open. Skipping animation.")
+                return
+
+            # Start from the current closed state
+            blink_height_left = 1 if self.closed in ["both", "left"] else ctx.leh
+            blink_height_right = 1 if self.closed in ["both", "right"] else ctx.reh
+
+            # Define the speed of animation in pixels per frame
+            movement_speed = BLINK_STEPS[speed]
+            _play_heights(device, ctx, state, _anim_heights(
+                blink_height_left, blink_height_right, ctx.leh, ctx.reh, movement_speed, eye
+            ))
+
+            # Update state to the eyes that remain closed
+            if eye == "left" and self.closed in ["both", "right"]:
+                self.closed = "right"
+            elif eye == "right" and self.closed in ["both", "left"]:
+                self.closed = "left"
+            else:
+                self.closed = None
 
 def get_constraints(config, device):
     """
@@ -686,177 +1167,102 @@ def get_constraints(config, device):
     min_y_offset = -(screen_height // 2 - max(left_eye["height"], right_eye["height"]) // 2)
     max_y_offset = screen_height // 2 - max(left_eye["height"], right_eye["height"]) // 2
 
-    logging.debug(
-        f"Constraints calculated: min_x_offset={min_x_offset}, max_x_offset={max_x_offset}, "
-        f"min_y_offset={min_y_offset}, max_y_offset={max_y_offset}"
+    logger.debug(
+        "Constraints calculated: min_x_offset=%s, max_x_offset=%s, min_y_offset=%s, max_y_offset=%s",
+        min_x_offset, max_x_offset, min_y_offset, max_y_offset,
     )
 
     return min_x_offset, max_x_offset, min_y_offset, max_y_offset
 
-def look(device, config, direction="C", speed="fast", face=None, curious=None, closed=None):
+def look(ctrl, direction="C", speed="fast", face=None, curious=None, closed=None):
     """
     Move the eyes to a specific position on the screen based on the cardinal direction, with optional face and curious mode.
 
-    :param device: Display device
-    :param config: Configuration dictionary
+    :param ctrl: EyeController of the display
     :param direction: Direction to move the eyes ("C", "L", "R", "T", "B", etc.)
     :param speed: Speed of movement ("fast", "medium", "slow")
     :param face: Optional face parameter to change during the animation
     :param curious: Optional toggle for curious mode
     """
-    global current_face, current_offset_x, current_offset_y, current_curious, current_closed
-
-    # Update global variables if parameters are provided
-    if face is not None:
-        current_face = face
-    if curious is not None:
-        current_curious = curious
-    else:
-        curious = current_curious  # Fall back to global curious state
-        
-    if closed is None:
-        closed = current_closed
-    else:
-        current_closed = closed  # Update global closed state
-
-    logging.info(f"Starting look animation towards {direction} at {speed} speed with face: {current_face}, curious={curious}")
+    # Update the eye state if parameters are provided
+    ctrl.face = face if face is not None else ctrl.face
+    ctrl.curious = curious if curious is not None else ctrl.curious
+    ctrl.closed = closed if closed is not None else ctrl.closed
+
+    logger.info(
+        "Starting look animation towards %s at %s speed with face: %s, curious=%s",
+        direction, speed, ctrl.face, ctrl.curious,
+    )
 
     # Get movement constraints
-    min_x_offset, max_x_offset, min_y_offset, max_y_offset = get_constraints(config, device)
+    min_x_offset, max_x_offset, min_y_offset, max_y_offset = ctrl.ctx.constraints
 
     # Determine target offsets based on direction
-    if direction == "L":
-        target_offset_x = min_x_offset
-        target_offset_y = 0
-    elif direction == "R":
-        target_offset_x = max_x_offset
-        target_offset_y = 0
-    elif direction == "T":
-        target_offset_x = 0
-        target_offset_y = min_y_offset
-    elif direction == "B":
-        target_offset_x = 0
-        target_offset_y = max_y_offset
-    elif direction == "TL":
-        target_offset_x = min_x_offset
-        target_offset_y = min_y_offset
-    elif direction == "TR":
-        target_offset_x = max_x_offset
-        target_offset_y = min_y_offset
-    elif direction == "BL":
-        target_offset_x = min_x_offset
-        target_offset_y = max_y_offset
-    elif direction == "BR":
-        target_offset_x = max_x_offset
-        target_offset_y = max_y_offset
-    else:  # Center
-        target_offset_x = 0
-        target_offset_y = 0
-
-    # Pass the animation command to `draw_eyes`
-    draw_eyes(
-        device,
-        config,
-        offset_x=current_offset_x,
-        offset_y=current_offset_y,
-        face=current_face,
-        curious=current_curious,
+    dir_x, dir_y = _DIRECTIONS.get(direction, (0, 0))
+    target_offset_x = min_x_offset if dir_x < 0 else max_x_offset if dir_x > 0 else 0
+    target_offset_y = min_y_offset if dir_y < 0 else max_y_offset if dir_y > 0 else 0
+
+    # Pass the animation command to the controller
+    ctrl.draw(
         command="look",
         target_offset_x=target_offset_x,
         target_offset_y=target_offset_y,
-        speed=speed,
+        speed=_SPEED_IDX.get(speed, 1),
     )
 
-def blink(device, config, eye="both", speed="fast", face=None, curious=None, closed=None):
+def blink(ctrl, eye="both", speed="fast", face=None, curious=None, closed=None):
     """
-    Pass blink command and parameters to the draw_eyes function.
+    Pass blink command and parameters to the controller.
     """
-    global current_face, current_offset_x, current_offset_y, current_curious, current_closed
-    logging.info(f"Starting blinking animation for {eye} eye(s) at {speed} speed with face: {current_face}, curious={curious}")
-    
-    if closed is None:
-        closed = current_closed
-    else:
-        current_closed = closed  # Update global closed state
-        
-    draw_eyes(
-        device,
-        config,
-        offset_x=current_offset_x,
-        offset_y=current_offset_y,
-        face=current_face,
-        curious=curious,
-        command="blink",
-        speed=speed,
-        eye=eye,
+    logger.info(
+        "Starting blinking animation for %s eye(s) at %s speed with face: %s, curious=%s",
+        eye, speed, ctrl.face, curious,
     )
+    ctrl.closed = closed if closed is not None else ctrl.closed
+    ctrl.draw(curious=curious, command="blink", speed=_SPEED_IDX.get(speed, 1), eye=eye)
 
-def eye_close(device, config, eye="both", speed="medium", face=None, curious=None, closed=None):
+def eye_close(ctrl, eye="both", speed="medium", face=None, curious=None, closed=None):
     """
-    Pass close command and parameters to the draw_eyes function.
+    Pass close command and parameters to the controller.
     """
-    global current_face, current_offset_x, current_offset_y, current_curious, current_closed
-    logging.info(f"Starting closing animation for {eye} eye(s) at {speed} speed with face: {current_face}, curious={curious}")
-    
-    if closed is None:
-        closed = current_closed
-    else:
-        current_closed = closed  # Update global closed state
-        
-    draw_eyes(
-        device,
-        config,
-        offset_x=current_offset_x,
-        offset_y=current_offset_y,
-        face=current_face,
-        curious=curious,
-        command="close",
-        speed=speed,
-        eye=eye,
+    logger.info(
+        "Starting closing animation for %s eye(s) at %s speed with face: %s, curious=%s",
+        eye, speed, ctrl.face, curious,
     )
-    
-def eye_open(device, config, eye="both", speed="medium", face=None, curious=None, closed=None):
+    ctrl.closed = closed if closed is not None else ctrl.closed
+    ctrl.draw(curious=curious, command="close", speed=_SPEED_IDX.get(speed, 1), eye=eye)
+
+def eye_open(ctrl, eye="both", speed="medium", face=None, curious=None, closed=None):
     """
-    Pass the 'open' command and parameters to the draw_eyes function.
+    Pass the 'open' command and parameters to the controller.
     """
-    global current_face, current_offset_x, current_offset_y, current_curious, current_closed
-
-    logging.info(f"Starting opening animation for {eye} eye(s) at {speed} speed with face: {current_face}, curious={curious}")
+    logger.info(
+        "Starting opening animation for %s eye(s) at %s speed with face: %s, curious=%s",
+        eye, speed, ctrl.face, curious,
+    )
 
     # Ensure eyes start from their current closed state
-    if current_closed is None:
-        logging.warning("Eyes are already open. Skipping animation.")
+    if ctrl.closed is None:
+        logger.warning("Eyes are already open. Skipping animation.")
         return  # Exit if eyes are already open
 
-    # Call the draw_eyes function with the "open" command
-    draw_eyes(
-        device,
-        config,
-        offset_x=current_offset_x,
-        offset_y=current_offset_y,
-        face=current_face,
-        curious=curious,
-        command="open",
-        speed=speed,
-        eye=eye,
-    )
+    ctrl.draw(curious=curious, command="open", speed=_SPEED_IDX.get(speed, 1), eye=eye)
 
-def wakeup(device, config, eye="both", speed="medium", face=None, curious=None, closed=None):
+def wakeup(ctrl, eye="both", speed="medium", face=None, curious=None, closed=None):
     """
     Drawing wakeup animation: closed tired, open slow, close slow, open medium, close medium, open fast, default
     """
-    global current_face, current_offset_x, current_offset_y, current_curious, current_closed
-    draw_eyes(device, config, closed="both")
-    draw_eyes(device, config, face="tired")
+    ctrl.draw(closed="both")
+    ctrl.draw(face="tired")
     time.sleep(2)
-    eye_open(device, config, speed="slow")
-    eye_close(device, config, speed="slow")
+    eye_open(ctrl, speed="slow")
+    eye_close(ctrl, speed="slow")
     time.sleep(2)
-    eye_open(device, config, speed="medium")
-    eye_close(device, config, speed="medium")
+    eye_open(ctrl, speed="medium")
+    eye_close(ctrl, speed="medium")
     time.sleep(1)
-    eye_open(device, config, speed="fast")
-    draw_eyes(device, config, face="default")
+    eye_open(ctrl, speed="fast")
+    ctrl.draw(face="default")
 
 def main():
     # Load screen and render configurations
@@ -864,67 +1270,69 @@ def main():
     render_config = load_config("eyeconfig.toml", DEFAULT_RENDER_CONFIG)
 
     # Merge configurations
-    config = {**screen_config, **render_config}
+    config = deep_merge(screen_config, render_config)
 
-    # Initialize the display device
+    # Initialize the display device and the eye controller
     device = get_device(config)
+    ctrl = EyeController(device, config)
 
     # Main loop to test wakeup animation
-    logging.info(f"Starting main loop to test wakeup animation")
-    wakeup(device, config)
+    logger.info("Starting main loop to test wakeup animation")
+    wakeup(ctrl)
 
     # Main loop to test face change animation
-    logging.info(f"Starting main loop to test face change animation")
-    draw_eyes(device, config)
+    logger.info("Starting main loop to test face change animation")
+    ctrl.draw()
     time.sleep(3)    
-    draw_eyes(device, config, face="happy")
+    ctrl.draw(face="happy")
     time.sleep(3)
-    draw_eyes(device, config, face="angry")
+    ctrl.draw(face="angry")
     time.sleep(3)
-    draw_eyes(device, config, face="tired")
+    ctrl.draw(face="tired")
     time.sleep(3)
 
     # Main loop to test look animation with curious mode on
-    logging.info(f"Starting main loop to test look animation with curious mode on")
-    look(device, config, direction="TL", speed="fast", curious=True)
+    logger.info("Starting main loop to test look animation with curious mode on")
+    look(ctrl, direction="TL", speed="fast", curious=True)
     time.sleep(1)
-    look(device, config, direction="T", speed="fast")
+    look(ctrl, direction="T", speed="fast")
     time.sleep(1)
-    look(device, config, direction="TR", speed="fast")
+    look(ctrl, direction="TR", speed="fast")
     time.sleep(1)
-    look(device, config, direction="L", speed="medium")
+    look(ctrl, direction="L", speed="medium")
     time.sleep(1)
-    look(device, config, direction="R", speed="medium")
+    look(ctrl, direction="R", speed="medium")
     time.sleep(1)
-    look(device, config, direction="BL", speed="slow")
+    look(ctrl, direction="BL", speed="slow")
     time.sleep(1)
-    look(device, config, direction="B", speed="slow")
+    look(ctrl, direction="B", speed="slow")
     time.sleep(1)
-    look(device, config, direction="BR", speed="slow")
+    look(ctrl, direction="BR", speed="slow")
     time.sleep(1)
-    look(device, config, direction="C", speed="slow", curious=False)
+    look(ctrl, direction="C", speed="slow", curious=False)
 
     # Main loop to test blink animation
-    logging.info(f"Starting main loop to test blink animation")
-    blink(device, config)
+    logger.info("Starting main loop to test blink animation")
+    blink(ctrl)
     time.sleep(1)
-    blink(device, config, speed="slow", eye="left")
+    blink(ctrl, speed="slow", eye="left")
     time.sleep(1)
-    blink(device, config, speed="fast", eye="right")
+    blink(ctrl, speed="fast", eye="right")
 
     # Main loop to test close/open animation
-    logging.info(f"Starting main loop to test close/open animation")
-    eye_close(device, config)
+    logger.info("Starting main loop to test close/open animation")
+    eye_close(ctrl)
     time.sleep(1)
-    eye_open(device, config)
+    eye_open(ctrl)
     time.sleep(1)
-    eye_close(device, config, speed="slow", eye="left")
+    eye_close(ctrl, speed="slow", eye="left")
     time.sleep(1)
-    eye_open(device, config, speed="slow", eye="left")
+    eye_open(ctrl, speed="slow", eye="left")
     time.sleep(1)
-    eye_close(device, config, speed="fast", eye="right")
+    eye_close(ctrl, speed="fast", eye="right")
     time.sleep(1)
-    eye_open(device, config, speed="fast", eye="right")
+    eye_open(ctrl, speed="fast", eye="right")
+    wait_display(device)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
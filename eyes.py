@@ -3,7 +3,6 @@ import random
 import time
 import signal
 import sys
-import toml
 from PIL import Image, ImageDraw
 from luma.core.interface.serial import i2c, spi
 from luma.oled.device import ssd1306
@@ -15,6 +14,22 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
+def _parse_toml(file_path):
+    """
+    Parse a TOML file with the stdlib tomllib, or the toml package on Python < 3.11.
+
+    :param file_path: Path to the TOML file
+    :return: Parsed configuration dictionary
+    """
+    try:
+        import tomllib
+        mode = "rb"
+    except ImportError:  # Python < 3.11 has no tomllib, fall back to the toml package
+        import toml as tomllib
+        mode = "r"
+    with open(file_path, mode) as f:
+        return tomllib.load(f)
+
 # Load configuration from a TOML file
 def load_config(file_path):
     """
@@ -25,7 +40,7 @@ def load_config(file_path):
     """
     logging.info(f"Loading configuration from {file_path}...")
     try:
-        config = toml.load(file_path)
+        config = _parse_toml(file_path)
         logging.info("Configuration loaded successfully!")
         return config
     except Exception as e:
@@ -146,6 +161,7 @@ def on_idle(device, config):
     blink_height_right = right_eye_height_orig
     blink_direction = -1
     blinking = False
+    last_state = None
 
     IDLE_OFFSET_RANGE = 10
     MOVEMENT_SPEED = 1
@@ -176,8 +192,15 @@ def on_idle(device, config):
             blinking = True
             blink_direction = -1
 
+        # Skip drawing if nothing changed since the previous frame
+        state = (current_offset_x, current_offset_y, blink_height_left, blink_height_right)
+        if state == last_state:
+            time.sleep(1 / FPS)
+            continue
+
         # Draw eyes
         draw_eyes(device, config, current_offset_x, current_offset_y, blink_height_left, blink_height_right)
+        last_state = state
 
         # Maintain 30 FPS
         time.sleep(1 / FPS)
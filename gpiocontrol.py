@@ -1,91 +1,358 @@
 import logging
-from gpiozero import Button, RotaryEncoder
+from array import array
+import os
+import queue
+from collections import namedtuple
+from functools import partial
+from gpiozero import Button, Device, RotaryEncoder
+import shlex
+import shutil
 import subprocess
+import threading
 import time
 import pwnagotchi.plugins as plugins
 
+logger = logging.getLogger(__name__)
+
+# Characters that need bash to run a command: pipes, redirects, variables, globs, etc.
+SHELL_CHARS = frozenset('|&;<>()$`*?[]{}~!#\n')
+
+
+def parse_command(command):
+    """Split a command into arguments once, so it can run without starting a shell.
+    The program is resolved to its full path, which subprocess needs to start it with posix_spawn.
+    Commands using shell features or bash builtins are run with bash instead."""
+    if not command:
+        return None
+    if SHELL_CHARS.isdisjoint(command):
+        try:
+            argv = shlex.split(command)
+        except ValueError:
+            argv = None
+        path = shutil.which(argv[0]) if argv else None
+        if path:
+            return [path] + argv[1:]
+    return ["/bin/bash", "-c", command]
+
+
+# Backends of the buttons: GPIO buttons and encoders with gpiozero, or the touch buttons of the Pimoroni GFX HAT
+BACKENDS = ("gpiozero", "gfxhat")
+
+# Seconds a button has to be held for a long press, and the same in nanoseconds for the touch buttons
+HOLD_TIME = 1.0
+HOLD_TIME_NS = int(HOLD_TIME * 1_000_000_000)
+
+# Number of BCM GPIO pins of the Raspberry Pi (0-53)
+GPIO_COUNT = 54
+
+# Steps of the encoder in each direction before it wraps around
+ENCODER_MAX_STEPS = 1000
+
+# Seconds to wait after the last encoder step before running the up/down command for all steps turned
+ENCODER_BATCH_TIME = 0.05
+
+# Commands of the encoder, parsed once on load
+EncoderCommands = namedtuple('EncoderCommands', ('up', 'down', 'button_short_press', 'button_long_press'))
+
+
 class GPIOControl(plugins.Plugin):
     __author__ = 'https://github.com/RasTacsko'
-    __version__ = '0.1.9'
+    __version__ = '0.2.0'
     __license__ = 'GPL3'
-    __description__ = 'GPIO Button and Rotary Encoder support plugin with press, hold, and rotate logic.'
+    __description__ = 'GPIO Button, Rotary Encoder and GFX HAT Touch Button support plugin with press, hold, and rotate logic.'
 
     def __init__(self):
         self.buttons = {}
-        self.button_hold_times = {}  # Track button press times
+        self.gpio_commands = {}  # Short and long press commands of the buttons by GPIO
+        self.button_held = bytearray(GPIO_COUNT)  # Track if the current press of a button on each GPIO was held long enough for a long press
+        self.last_fired = array('q', [0]) * GPIO_COUNT  # Time of the last command of each GPIO in nanoseconds
+        self.min_interval_ns = 0
         self.encoder = None
         self.encoder_button = None
+        self.encoder_commands = EncoderCommands(None, None, None, None)
         self.previous_step = 0
+        self.encoder_pending = 0  # Steps turned since the last encoder command
+        self.encoder_timer = None
+        self.encoder_lock = threading.Lock()
+        self.touch = None  # GFX HAT touch module, imported by the gfxhat backend
+        self.touch_buttons = ()  # Names of the touch buttons
+        self.touch_button_indexes = {}
+        self.touch_commands = []  # Short and long press commands of the touch buttons by index
+        self.touch_hold_times = []  # Track touch button press times in nanoseconds by index
+        self.touch_last_fired = array('q')  # Time of the last command of each touch button in nanoseconds
+        self.commands = queue.SimpleQueue()  # Commands waiting for the command worker
+        self.children = []  # Commands still running
+        self.children_lock = threading.Lock()
+        self.stop_reaper = threading.Event()
+
+    def runcommand(self, command, env=None):
+        """Queue a command for the command worker, so the button callbacks return right away."""
+        self.commands.put((command, env))
+
+    def command_worker(self):
+        """Start the queued commands until None is queued."""
+        while True:
+            item = self.commands.get()
+            if item is None:
+                return
+            command, env = item
+            logger.info("Running command: %s", command)
+            # Don't wait for the command here, the next queued commands would have to wait until it finishes.
+            # Finished commands are reaped by the reaper thread.
+            # Without close_fds and start_new_session subprocess starts the command with posix_spawn (vfork) instead of
+            # copying the memory of pwnagotchi with fork. Files opened by Python are not inherited by the command anyway.
+            try:
+                process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                           close_fds=False, env=env)
+            except OSError as e:
+                logger.error("Error running command %s: %s", command, e)
+                continue
+            with self.children_lock:
+                self.children.append(process)
+
+    def reaper(self):
+        """Reap finished commands every second so they don't stay around as zombies.
+        Only our own commands are polled, so the exit status of other children of pwnagotchi is left alone."""
+        while not self.stop_reaper.wait(1.0):
+            with self.children_lock:
+                self.children = [process for process in self.children if process.poll() is None]
 
-    def runcommand(self, command):
-        logging.info(f"Running command: {command}")
-        process = subprocess.Popen(command, shell=True, stdin=None, stdout=open("/dev/null", "w"), stderr=None,
-                                   executable="/bin/bash")
-        process.wait()
+    def setup_pin_factory(self):
+        """Use pigpio for the pins when the pigpio daemon is running, it samples the pins with DMA and debounces them
+        with its glitch filter instead of in Python. Falls back to the default pin factory otherwise."""
+        if not self.options.get('pigpio', True) or Device.pin_factory is not None:
+            return
+        try:
+            from gpiozero.pins.pigpio import PiGPIOFactory
+            Device.pin_factory = PiGPIOFactory()
+            logger.info("Using the pigpio pin factory.")
+        except (ImportError, OSError) as e:
+            logger.warning("pigpio is not available, using the default pin factory: %s", e)
 
     def on_loaded(self):
-        logging.info("GPIO Button and Encoder plugin loaded.")
+        backend = self.options.get('backend', 'gpiozero')
+        if backend not in BACKENDS:
+            logger.error("Unknown backend '%s'. Available backends: %s", backend, ', '.join(BACKENDS))
+            return
+        logger.info("GPIO control plugin loaded with the %s backend.", backend)
+        self.min_interval_ns = int(self.options.get('min_interval_ms', 100)) * 1_000_000
+        threading.Thread(target=self.command_worker, daemon=True).start()
+        threading.Thread(target=self.reaper, daemon=True).start()
+        if backend == "gfxhat":
+            self.setup_gfxhat()
+        else:
+            self.setup_gpiozero()
+            self.tune_threads()
+
+    def callback_threads(self):
+        """Get the Python threads running the gpiozero button callbacks: the callback thread of the pigpio pin factory,
+        and the hold threads of the buttons. The edge callbacks of the other pin factories run on threads started
+        in C, which are left alone."""
+        threads = []
+        try:
+            from gpiozero.pins.pigpio import PiGPIOFactory
+        except ImportError:
+            PiGPIOFactory = None
+        if PiGPIOFactory is not None and isinstance(Device.pin_factory, PiGPIOFactory):
+            threads.append(getattr(Device.pin_factory.connection, '_notify', None))
+        for button in (*self.buttons.values(), self.encoder_button):
+            threads.append(getattr(button, '_hold_thread', None))
+        return [thread for thread in threads if isinstance(thread, threading.Thread)]
+
+    def tune_threads(self):
+        """Set the priority and the CPU of the threads running the button callbacks.
+        Linux sets both per thread, so the rest of pwnagotchi is left alone."""
+        nice = self.options.get('nice')
+        cpu = self.options.get('cpu')
+        if nice is None and cpu is None:
+            return
+        for thread in self.callback_threads():
+            if thread.native_id is None:
+                continue
+            try:
+                if nice is not None:
+                    os.setpriority(os.PRIO_PROCESS, thread.native_id, nice)
+                if cpu is not None:
+                    os.sched_setaffinity(thread.native_id, {cpu})
+                logger.info("Set nice %s and CPU %s for thread %s.", nice, cpu, thread.name)
+            except OSError as e:
+                logger.warning("Can't set nice %s and CPU %s for thread %s: %s", nice, cpu, thread.name, e)
+
+    def setup_gpiozero(self):
+        """Set up the GPIO buttons and the encoder with gpiozero."""
+        self.setup_pin_factory()
 
         # Initialize GPIO buttons
         gpios = self.options.get('gpios', {})
         for gpio, actions in gpios.items():
             gpio = int(gpio)
-            button = Button(gpio, pull_up=True, bounce_time=0.05, hold_time=1.0)
-            short_press_command = actions.get('short_press')
-            long_press_command = actions.get('long_press')
-            button.when_pressed = lambda btn=button, gpio=gpio: self.on_button_pressed(gpio)
-            button.when_released = lambda btn=button, gpio=gpio, short_press_command=short_press_command, long_press_command=long_press_command: self.on_button_released(gpio, short_press_command, long_press_command)
+            button = Button(gpio, pull_up=True, bounce_time=0.05, hold_time=HOLD_TIME)
+            short_press_command = parse_command(actions.get('short_press'))
+            long_press_command = parse_command(actions.get('long_press'))
+            button.when_pressed = partial(self.on_button_pressed, gpio)
+            button.when_held = partial(self.on_button_held, gpio)
+            button.when_released = partial(self.on_button_released, gpio)
             self.buttons[gpio] = button
-            logging.info(f"Configured GPIO #{gpio} for short press: {short_press_command} and long press: {long_press_command}")
+            self.gpio_commands[gpio] = (short_press_command, long_press_command)
+            logger.info("Configured GPIO #%s for short press: %s and long press: %s", gpio, short_press_command, long_press_command)
 
         # Initialize Encoder and encoder button
         encoder_pins = self.options.get('encoder', {})
         encoder_a = encoder_pins.get('a')
         encoder_b = encoder_pins.get('b')
         encoder_button_pin = encoder_pins.get('button')
-        encoder_up_command = encoder_pins.get('up_command')
-        encoder_down_command = encoder_pins.get('down_command')
+        self.encoder_commands = EncoderCommands(
+            parse_command(encoder_pins.get('up_command')),
+            parse_command(encoder_pins.get('down_command')),
+            parse_command(encoder_pins.get('button_short_press')),
+            parse_command(encoder_pins.get('button_long_press')),
+        )
 
         if encoder_a and encoder_b:
-            self.encoder = RotaryEncoder(encoder_a, encoder_b, max_steps=1000, bounce_time=0.1, wrap=True)
-            self.encoder.when_rotated = lambda: self.on_encoder_rotated(encoder_up_command, encoder_down_command)
-            logging.info(f"Encoder configured with pins A: {encoder_a}, B: {encoder_b}")
+            self.encoder = RotaryEncoder(encoder_a, encoder_b, max_steps=ENCODER_MAX_STEPS, bounce_time=0.1, wrap=True)
+            self.encoder.when_rotated = self.on_encoder_rotated
+            logger.info("Encoder configured with pins A: %s, B: %s", encoder_a, encoder_b)
         if encoder_button_pin:
-            self.encoder_button = Button(encoder_button_pin, pull_up=True, bounce_time=0.05, hold_time=1.0)
-            self.encoder_button.when_pressed = lambda: self.on_button_pressed(encoder_button_pin)
-            self.encoder_button.when_released = lambda: self.on_button_released(encoder_button_pin, encoder_pins.get('button_short_press'), encoder_pins.get('button_long_press'))
-            logging.info(f"Encoder button configured on GPIO {encoder_button_pin}.")
+            encoder_button_pin = int(encoder_button_pin)
+            self.encoder_button = Button(encoder_button_pin, pull_up=True, bounce_time=0.05, hold_time=HOLD_TIME)
+            self.encoder_button.when_pressed = partial(self.on_button_pressed, encoder_button_pin)
+            self.encoder_button.when_held = partial(self.on_button_held, encoder_button_pin)
+            self.encoder_button.when_released = partial(self.on_button_released, encoder_button_pin)
+            self.gpio_commands[encoder_button_pin] = self.encoder_commands[2:]
+            logger.info("Encoder button configured on GPIO %s.", encoder_button_pin)
+
+    def setup_gfxhat(self):
+        """Set up the touch buttons of the GFX HAT."""
+        from pwnagotchi.ui.hw.libs.pimoroni.gfxhat import touch
+        self.touch = touch
+        self.touch_buttons = touch.NAME_MAPPING
+        self.touch_button_indexes = {name: index for index, name in enumerate(self.touch_buttons)}
+        self.touch_commands = [(None, None)] * len(self.touch_buttons)
+        self.touch_hold_times = [0] * len(self.touch_buttons)
+        self.touch_last_fired = array('q', [0]) * len(self.touch_buttons)
+
+        touch.setup()
+        if self.options.get('self_test', False):
+            # Blink the LEDs in the background, so the test doesn't hold up loading pwnagotchi
+            threading.Thread(target=self.led_test, daemon=True).start()
+
+        # Initialize touch buttons
+        buttons = self.options.get('buttons', {})
+        for button_name, actions in buttons.items():
+            if button_name in self.touch_button_indexes:
+                button_index = self.touch_button_indexes[button_name]
+                short_press_command = parse_command(actions.get('short_press'))
+                long_press_command = parse_command(actions.get('long_press'))
+                self.touch_commands[button_index] = (short_press_command, long_press_command)
+                touch.on(button_index, partial(self.on_touch_event, button_index))
+                logger.info("Configured button '%s' with short press: %s, long press: %s", button_name, short_press_command, long_press_command)
+            else:
+                logger.warning("Button '%s' not recognized. Available buttons: %s", button_name, ', '.join(self.touch_buttons))
+
+    def led_test(self):
+        """Light up the LEDs of the touch buttons one by one."""
+        logger.info("Testing raw touch functionality.")
+        try:
+            for i in range(len(self.touch_buttons)):
+                self.touch.set_led(i, 1)  # Test LEDs
+                time.sleep(0.1)
+                self.touch.set_led(i, 0)
+                logger.info("LED test for button index %s complete.", i)
+        except Exception as e:
+            logger.error("Error testing LEDs: %s", e)
+
+    def on_touch_event(self, button_index, event_obj):
+        """Handle touch events and determine press duration."""
+        event_type = event_obj.event  # Extract the event type
+
+        if event_type == 'press':
+            self.touch_hold_times[button_index] = time.monotonic_ns()
+            self.touch.set_led(button_index, 1)  # Turn LED on when button is pressed
+        elif event_type == 'release':
+            hold_time = time.monotonic_ns() - self.touch_hold_times[button_index]
+            self.touch.set_led(button_index, 0)  # Turn LED off when button is released
+            short_press_command, long_press_command = self.touch_commands[button_index]
+            button_name = self.touch_buttons[button_index]
+            if hold_time >= HOLD_TIME_NS:
+                logger.info("Long press detected on '%s'. Running command: %s", button_name, long_press_command)
+                if long_press_command and self.can_fire(self.touch_last_fired, button_index):
+                    self.runcommand(long_press_command)
+            else:
+                logger.info("Short press detected on '%s'. Running command: %s", button_name, short_press_command)
+                if short_press_command and self.can_fire(self.touch_last_fired, button_index):
+                    self.runcommand(short_press_command)
+
+    def can_fire(self, last_fired, index):
+        """Check that the last command of a button was more than min_interval_ms ago, so a noisy button can't start
+        a burst of commands, and record the time of this one.
+        last_fired holds the times of the GPIO buttons by GPIO, or of the touch buttons by index."""
+        now = time.monotonic_ns()
+        if now - last_fired[index] < self.min_interval_ns:
+            logger.debug("Ignoring press of button %s within min_interval_ms of the last one.", index)
+            return False
+        last_fired[index] = now
+        return True
 
     def on_button_pressed(self, gpio):
-        """Record the time the button was pressed."""
-        self.button_hold_times[gpio] = time.time()
-        logging.debug(f"Button {gpio} pressed.")
-
-    def on_button_released(self, gpio, short_press_command, long_press_command):
-        """Handle button release and determine if it's a short or long press."""
-        hold_time = time.time() - self.button_hold_times[gpio]
-        logging.info(f"Button {gpio} released after {hold_time:.2f} seconds.")
-        if hold_time >= 1.0:
-            logging.info(f"Long press detected on GPIO {gpio}. Running command: {long_press_command}")
-            if long_press_command:
-                self.runcommand(long_press_command)
-        else:
-            logging.info(f"Short press detected on GPIO {gpio}. Running command: {short_press_command}")
-            if short_press_command:
-                self.runcommand(short_press_command)
+        """Start a new press of the button."""
+        self.button_held[gpio] = 0
+        logger.debug("Button %s pressed.", gpio)
 
-    def on_encoder_rotated(self, up_command, down_command):
-        """Handle encoder rotation."""
+    def on_button_held(self, gpio):
+        """Handle a long press as soon as the button is held for hold_time."""
+        self.button_held[gpio] = 1
+        _, long_press_command = self.gpio_commands[gpio]
+        logger.info("Long press detected on GPIO %s. Running command: %s", gpio, long_press_command)
+        if long_press_command and self.can_fire(self.last_fired, gpio):
+            self.runcommand(long_press_command)
+
+    def on_button_released(self, gpio):
+        """Handle a short press if the button was released before it was held."""
+        # gpiozero clears is_held before calling when_released, so the held state of the press is tracked here
+        if self.button_held[gpio]:
+            return
+        short_press_command, _ = self.gpio_commands[gpio]
+        logger.info("Short press detected on GPIO %s. Running command: %s", gpio, short_press_command)
+        if short_press_command and self.can_fire(self.last_fired, gpio):
+            self.runcommand(short_press_command)
+
+    def on_encoder_rotated(self):
+        """Handle encoder rotation, the steps are collected until the encoder stops turning for ENCODER_BATCH_TIME."""
         steps = self.encoder.steps
-        if steps > self.previous_step:
-            logging.info(f"Encoder rotated up. Running command: {up_command}")
-            if up_command:
-                self.runcommand(up_command)
-        elif steps < self.previous_step:
-            logging.info(f"Encoder rotated down. Running command: {down_command}")
-            if down_command:
-                self.runcommand(down_command)
-        self.previous_step = steps
+        delta = steps - self.previous_step
+        if not delta:
+            return
+        # A jump of more than half the range is the encoder wrapping around from one end to the other
+        if delta > ENCODER_MAX_STEPS:
+            delta -= 2 * ENCODER_MAX_STEPS + 1
+        elif delta < -ENCODER_MAX_STEPS:
+            delta += 2 * ENCODER_MAX_STEPS + 1
+        with self.encoder_lock:
+            self.encoder_pending += delta
+            self.previous_step = steps
+            if self.encoder_timer:
+                self.encoder_timer.cancel()
+            self.encoder_timer = threading.Timer(ENCODER_BATCH_TIME, self.on_encoder_stopped)
+            self.encoder_timer.daemon = True
+            self.encoder_timer.start()
+
+    def on_encoder_stopped(self):
+        """Run the up or down command once for all steps turned, with the number of steps in the DELTA variable."""
+        with self.encoder_lock:
+            delta = self.encoder_pending
+            self.encoder_pending = 0
+            self.encoder_timer = None
+        if not delta:
+            return
+        # Pick the up (0) or down (1) command by the sign of the steps turned
+        command = self.encoder_commands[delta < 0]
+        logger.info("Encoder rotated %s steps. Running command: %s", delta, command)
+        if command:
+            self.runcommand(command, dict(os.environ, DELTA=str(delta)))
 
     def on_unload(self, ui):
-        logging.info("GPIO Button and Encoder control plugin unloaded.")
\ No newline at end of file
+        self.commands.put(None)
+        self.stop_reaper.set()
+        if self.encoder_timer:
+            self.encoder_timer.cancel()
+        logger.info("GPIO control plugin unloaded.")
\ No newline at end of file